@@ -248,6 +248,7 @@ pub fn create_router(state: ApiState) -> Router {
         .route("/api/ollama/process/ultra-threaded", post(ollama_process_ultra_threaded))
         .route("/api/ollama/conversation", post(multi_model_conversation))
         .route("/api/available-files", get(list_available_files))
+        .route("/api/batch", post(batch_process))
         .with_state(state)
 }
 
@@ -1166,6 +1167,84 @@ pub async fn list_available_files() -> Json<Value> {
     }))
 }
 
+/// Single sub-request inside a batch payload
+#[derive(Debug, serde::Deserialize)]
+pub struct BatchSubRequest {
+    pub id: String,
+    pub method: String,
+    pub url: String,
+    #[serde(default)]
+    pub body: Option<Value>,
+}
+
+/// Request payload for executing several API calls in one round trip
+#[derive(Debug, serde::Deserialize)]
+pub struct BatchRequest {
+    pub requests: Vec<BatchSubRequest>,
+}
+
+/// Execute several API requests in one round trip (sub-requests run in order)
+pub async fn batch_process(
+    State(state): State<ApiState>,
+    Json(payload): Json<BatchRequest>,
+) -> Json<Value> {
+    let mut serviced_requests = Vec::with_capacity(payload.requests.len());
+    
+    for sub_request in payload.requests {
+        let (status, body) = dispatch_batch_request(&state, &sub_request).await;
+        serviced_requests.push(json!({
+            "id": sub_request.id,
+            "status_code": status.as_u16(),
+            "body": body
+        }));
+    }
+    
+    Json(json!({
+        "status": "success",
+        "serviced_requests": serviced_requests
+    }))
+}
+
+/// Route a batch sub-request to the matching handler
+async fn dispatch_batch_request(
+    state: &ApiState,
+    sub_request: &BatchSubRequest,
+) -> (StatusCode, Value) {
+    let method = sub_request.method.to_ascii_uppercase();
+    let body = sub_request.body.clone().unwrap_or(Value::Null);
+    
+    let result = match (method.as_str(), sub_request.url.as_str()) {
+        ("GET", "/health") => Ok(health_check().await),
+        ("GET", "/api/files") => Ok(get_watched_files(State(state.clone())).await),
+        ("GET", "/api/available-files") => Ok(list_available_files().await),
+        ("GET", url) if url.starts_with("/api/content/") => {
+            let file_path = url["/api/content/".len()..].to_string();
+            get_file_content(State(state.clone()), Path(file_path)).await
+        }
+        ("GET", url) if url.starts_with("/api/watch/") => {
+            let file_path = url["/api/watch/".len()..].to_string();
+            stop_watching(State(state.clone()), Path(file_path)).await
+        }
+        ("POST", "/api/watch") => match serde_json::from_value::<StartWatchingRequest>(body) {
+            Ok(payload) => start_watching(State(state.clone()), Json(payload)).await,
+            Err(_) => Err(StatusCode::UNPROCESSABLE_ENTITY),
+        },
+        ("POST", "/api/ollama/process") => match serde_json::from_value::<OllamaProcessRequest>(body) {
+            Ok(payload) => ollama_process_json(State(state.clone()), Json(payload)).await,
+            Err(_) => Err(StatusCode::UNPROCESSABLE_ENTITY),
+        },
+        _ => Err(StatusCode::NOT_FOUND),
+    };
+    
+    match result {
+        Ok(Json(value)) => (StatusCode::OK, value),
+        Err(status) => (status, json!({
+            "status": "error",
+            "message": status.canonical_reason().unwrap_or("Request failed")
+        })),
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -1189,4 +1268,26 @@ mod tests {
         
         assert_eq!(request.file_path, "/test/file.json");
     }
+
+    #[tokio::test]
+    async fn test_batch_process() {
+        let state = ApiState {
+            json_manager: Arc::new(JsonStreamManager::new()),
+        };
+        let request: BatchRequest = serde_json::from_value(json!({
+            "requests": [
+                {"id": "0", "method": "GET", "url": "/health"},
+                {"id": "1", "method": "GET", "url": "/api/unknown"}
+            ]
+        })).unwrap();
+        
+        let body = batch_process(State(state), Json(request)).await.0;
+        let serviced = body["serviced_requests"].as_array().unwrap();
+        
+        assert_eq!(serviced.len(), 2);
+        assert_eq!(serviced[0]["id"], "0");
+        assert_eq!(serviced[0]["status_code"], 200);
+        assert_eq!(serviced[0]["body"]["status"], "healthy");
+        assert_eq!(serviced[1]["status_code"], 404);
+    }
 } 
\ No newline at end of file
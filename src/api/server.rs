@@ -37,6 +37,7 @@ pub async fn start_api_server(port: u16) -> Result<(), Box<dyn std::error::Error
     info!("   POST /api/ollama/process/ultra-threaded - Process JSON file with Ollama AI (maximum threading, parallel operations)");
     info!("   POST /api/ollama/conversation - Multi-model AI conversation (models talk to each other)");
     info!("   GET  /api/available-files      - List available JSON files in directory");
+    info!("   POST /api/batch                - Execute several API requests in one round trip");
     
     // Start server
     axum::serve(listener, app).await?;
@@ -65,6 +65,25 @@ check_api_health() {
     fi
 }
 
+# Function to check the Python API test script compiles (test_api.py is run
+# separately, so problems here are reported but don't stop this suite)
+check_python_syntax() {
+    echo -e "${BLUE}🔍 Checking Python test scripts...${NC}"
+    
+    if ! command -v python3 >/dev/null 2>&1; then
+        echo -e "${YELLOW}⚠️ python3 not found, skipping test_api.py syntax check${NC}"
+        return 1
+    fi
+    
+    if python3 -m py_compile "$SCRIPT_DIR/test_api.py"; then
+        echo -e "${GREEN}✅ test_api.py compiles${NC}"
+        return 0
+    else
+        echo -e "${YELLOW}⚠️ test_api.py has syntax errors${NC}"
+        return 1
+    fi
+}
+
 # Function to check Ollama
 check_ollama() {
     echo -e "${BLUE}🔍 Checking Ollama...${NC}"
@@ -149,6 +168,7 @@ main() {
     check_api_health || exit 1
     check_ollama
     check_wscat
+    check_python_syntax || true
     echo ""
     
     # Run tests
@@ -5,86 +5,452 @@ Tests all endpoints including the new Ollama JSON processing
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import websocket
+import orjson
+import argparse
+import atexit
+import contextlib
+import functools
+import io
+import os
+import selectors
+import threading
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 BASE_URL = "http://localhost:8080"
+WS_BASE_URL = "ws://localhost:8080"
 TIMEOUT = 30
+DEFAULT_TIMEOUT = (3.0, TIMEOUT)  # (connect, read) seconds for HTTP requests
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read per chunk from streamed responses
+SAMPLE_FILE = "sample_data.json"
+# The server is started from the repo root, so update the copy it watches
+# regardless of where this script is run from
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", SAMPLE_FILE)
+WS_TEST_DURATION = 5  # max seconds to wait for streamed frames
+WS_EXPECTED_UPDATES = 1  # stop listening once this many updates of our write arrive
+WS_DRAIN_TIMEOUT = 0.05  # idle gap that ends a drained batch of frames
+WS_UPDATE_BATCH = 1  # price ticks per file write; raise to stress the streaming pipeline
+VERBOSE = False  # pretty-print full response bodies (set with --verbose)
+MAX_ERROR_TEXT = 500  # max characters of an error or non-JSON body to print
 
-def test_endpoint(method, endpoint, data=None, description=""):
+# Full URLs for every endpoint the suite calls, built once
+_URLS = {
+    endpoint: BASE_URL + endpoint
+    for endpoint in (
+        "/health",
+        "/api/watch",
+        "/api/files",
+        f"/api/content/{SAMPLE_FILE}",
+        "/api/ollama/process",
+        "/api/batch",
+    )
+}
+_STREAM_URL = f"{WS_BASE_URL}/api/stream/{SAMPLE_FILE}"
+
+# Shared session so every test reuses the keep-alive connection to the API;
+# transient gateway errors are retried with backoff instead of failing the run.
+# Read timeouts are not retried: the server may still be working on the request
+# (e.g. an Ollama job), and resending it would only queue duplicate work.
+RETRY = Retry(
+    total=3,
+    read=0,
+    backoff_factor=0.1,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=["GET", "POST"],
+    raise_on_status=False,
+)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(max_retries=RETRY, pool_connections=4, pool_maxsize=8))
+SESSION.headers.update({"Content-Type": "application/json", "Connection": "keep-alive"})
+
+# Serializes writes of buffered test output to stdout
+_PRINT_LOCK = threading.Lock()
+
+# Summary line for each WebSocket frame type (unknown types are not printed)
+_HANDLERS = {
+    "initial": lambda d: f"   📡 initial file={d.get('file_path')}",
+    "update": lambda d: f"   🔄 update @ {d.get('timestamp')} file={d.get('file_path')} ticks={_update_ticks(d)}",
+    "pong": lambda d: f"   🏓 pong @ {d.get('timestamp')}",
+}
+_IGNORE_FRAME = lambda d: None
+
+@contextlib.contextmanager
+def buffered_output():
+    """Collect a test's output and write it to stdout in one piece"""
+    # Buffering keeps concurrent tests from interleaving their lines
+    out = io.StringIO()
+    try:
+        yield functools.partial(print, file=out)
+    finally:
+        with _PRINT_LOCK:
+            sys.stdout.write(out.getvalue())
+            sys.stdout.flush()
+
+def format_result(result, size=None):
+    """Pretty-print a response body in verbose mode, otherwise summarize it in one line"""
+    if VERBOSE:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+    summary = [f"keys={list(result)[:5]}"] if isinstance(result, dict) else [type(result).__name__]
+    if size is not None:
+        summary.append(f"bytes={size}")
+    return f"({', '.join(summary)})"
+
+def read_streamed_body(response):
+    """Read a streamed response body chunk by chunk as it arrives"""
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        body.extend(chunk)
+    return body
+
+def test_endpoint(method, endpoint, data=None, description="", stream=False):
     """Test an API endpoint and return the response"""
-    url = f"{BASE_URL}{endpoint}"
+    url = _URLS.get(endpoint) or BASE_URL + endpoint
     
-    print(f"\n🔍 Testing: {description}")
-    print(f"   {method} {endpoint}")
+    with buffered_output() as log:
+        log(f"\n🔍 Testing: {description}")
+        log(f"   {method} {endpoint}")
+        
+        try:
+            if method == "GET":
+                response = SESSION.get(url, timeout=DEFAULT_TIMEOUT, stream=stream)
+            elif method == "POST":
+                response = SESSION.post(url, json=data, timeout=DEFAULT_TIMEOUT, stream=stream)
+            else:
+                log(f"❌ Unknown method: {method}")
+                return None
+                
+            log(f"   Status: {response.status_code}")
+            
+            # Read and decode the body once; both branches work from these bytes
+            body = read_streamed_body(response) if stream else response.content
+            text = None
+            try:
+                result = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                text = body.decode("utf-8", "replace")
+            
+            if response.status_code == 200:
+                if text is None:
+                    log(f"   ✅ Success: {format_result(result, len(body))}")
+                    return result
+                log(f"   ⚠️ Response is not JSON: {text[:MAX_ERROR_TEXT]}")
+                return text
+            else:
+                log(f"   ❌ Error: {response.status_code}")
+                if text is None:
+                    details = orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+                    log(f"   Error details: {details[:MAX_ERROR_TEXT]}")
+                else:
+                    log(f"   Error text: {text[:MAX_ERROR_TEXT]}")
+                return None
+                
+        except requests.exceptions.RequestException as e:
+            log(f"   ❌ Request failed: {e}")
+            return None
+
+def test_batch(calls):
+    """Send (method, endpoint, data, description) calls to /api/batch in one round trip"""
+    payload = {"requests": [
+        {"id": str(i), "method": method, "url": endpoint, "body": data}
+        for i, (method, endpoint, data, _) in enumerate(calls)
+    ]}
     
-    try:
-        if method == "GET":
-            response = requests.get(url, timeout=TIMEOUT)
-        elif method == "POST":
-            headers = {"Content-Type": "application/json"}
-            response = requests.post(url, json=data, headers=headers, timeout=TIMEOUT)
-        else:
-            print(f"❌ Unknown method: {method}")
+    with buffered_output() as log:
+        log(f"\n🔍 Testing: Batch Request ({len(calls)} calls)")
+        log("   POST /api/batch")
+        
+        try:
+            response = SESSION.post(_URLS["/api/batch"], json=payload, timeout=DEFAULT_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            log(f"   ❌ Request failed: {e}")
             return None
-            
-        print(f"   Status: {response.status_code}")
         
-        if response.status_code == 200:
-            try:
-                result = response.json()
-                print(f"   ✅ Success: {json.dumps(result, indent=2)}")
-                return result
-            except json.JSONDecodeError:
-                print(f"   ⚠️ Response is not JSON: {response.text}")
-                return response.text
-        else:
-            print(f"   ❌ Error: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"   Error details: {json.dumps(error, indent=2)}")
-            except:
-                print(f"   Error text: {response.text}")
+        log(f"   Status: {response.status_code}")
+        if response.status_code != 200:
+            log(f"   ❌ Error: {response.status_code}")
+            return None
+        
+        body = response.content
+        try:
+            results = orjson.loads(body)["serviced_requests"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            text = body.decode("utf-8", "replace")
+            log(f"   ❌ Unexpected batch response: {text[:MAX_ERROR_TEXT]}")
             return None
+        
+        for (method, endpoint, _, description), result in zip(calls, results):
+            status = "✅" if result["status_code"] == 200 else "❌"
+            log(f"\n   {status} {description}")
+            log(f"      {method} {endpoint} -> {result['status_code']}")
+            log(f"      {format_result(result['body'])}")
+        return results
+
+def _locate_sample_fields(f):
+    """Find the byte spans of the top-level timestamp and price values in the sample file"""
+    f.seek(0)
+    raw = f.read()
+    
+    # The top-level keys come before "trades", so the first match is the one we want
+    ts_start = raw.index(b'"timestamp": "') + len(b'"timestamp": "')
+    ts_end = raw.index(b'"', ts_start)
+    price_start = raw.index(b'"price": ') + len(b'"price": ')
+    price_end = raw.index(b',', price_start)
+    return ts_start, ts_end - ts_start, raw[ts_end:price_start], price_end - price_start
+
+_sample_fields = None  # cached (ts_offset, ts_len, bytes between the values, price_len)
+_sample_file = None  # unbuffered handle kept open for in-place updates
+_sample_original = None  # file contents before the first update, restored at exit
+
+def _close_sample_file():
+    """Close the in-place update handle and restore the sample file's original contents"""
+    global _sample_file, _sample_fields, _sample_original
+    if _sample_file is not None:
+        _sample_file.close()
+    _sample_file = None
+    _sample_fields = None
+    
+    # Test runs shouldn't leave the committed fixture modified or reformatted
+    if _sample_original is not None:
+        with open(SAMPLE_PATH, 'wb') as f:
+            f.write(_sample_original)
+        _sample_original = None
+
+atexit.register(_close_sample_file)
+
+_iso_second = None  # epoch second that _iso_prefix was formatted for
+_iso_prefix = ""
+
+def _iso_now(ns):
+    """Format a time.time_ns() value as an ISO-8601 UTC timestamp with microseconds"""
+    global _iso_second, _iso_prefix
+    
+    # Only the fractional part changes within a second, so reuse the date prefix
+    sec = ns // 1_000_000_000
+    if sec != _iso_second:
+        _iso_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _iso_second = sec
+    return f"{_iso_prefix}.{ns % 1_000_000_000 // 1000:06d}Z"
+
+def _rewrite_sample_file(timestamp, price, updates=None):
+    """Full read-modify-write, used for batches and when fields can't be patched in place"""
+    with open(SAMPLE_PATH, 'rb') as f:
+        data = orjson.loads(f.read())
+    
+    data['timestamp'] = timestamp
+    data['price'] = price
+    if updates:
+        data['updates'] = updates
+    else:
+        data.pop('updates', None)
+    
+    with open(SAMPLE_PATH, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+def update_sample_file(batch=1, log=print):
+    """Modify sample_data.json so the server streams an update carrying `batch` price ticks
+
+    Returns the timestamp written, which the streamed update's content will carry.
+    """
+    global _sample_file, _sample_fields, _sample_original
+    
+    if _sample_original is None:
+        with open(SAMPLE_PATH, 'rb') as f:
+            _sample_original = f.read()
+    
+    ns = time.time_ns()
+    timestamp = _iso_now(ns)
+    price = round(45000 + (ns // 10_000_000) % 10_000 / 100, 2)
+    
+    if batch > 1:
+        # One write (and so one watcher event and one WS frame) for the whole
+        # batch; the array is replaced rather than extended to keep the file small
+        updates = [{"t": timestamp, "p": round(price + i * 0.01, 2)} for i in range(batch)]
+        _rewrite_sample_file(timestamp, updates[-1]["p"], updates)
+        _sample_fields = None
+        log(f"   📝 Updated {SAMPLE_FILE} with {batch} ticks")
+        return timestamp
+    
+    # Keep the file open across updates rather than reopening it each time.
+    # Plain write() calls are used instead of an mmap because inotify does not
+    # report changes made through a mapping, and the server's watcher relies on it.
+    if _sample_file is None:
+        _sample_file = open(SAMPLE_PATH, 'r+b', buffering=0)
+    if _sample_fields is None:
+        try:
+            _sample_fields = _locate_sample_fields(_sample_file)
+        except ValueError:
+            # Unexpected layout (e.g. compact JSON); the full rewrite below
+            # normalizes it and the fields are located again next time
+            pass
+    
+    # Overwrite the two values in place with a single write covering both, so
+    # the watcher never reads a new timestamp next to the old price. The bytes
+    # between them are unchanged. Leading spaces keep the price field width
+    # fixed and are still valid JSON.
+    patch = None
+    if _sample_fields is not None:
+        ts_offset, ts_len, between, price_len = _sample_fields
+        price_text = f"{price:.2f}".rjust(price_len)
+        if len(timestamp) == ts_len and len(price_text) == price_len:
+            patch = timestamp.encode() + between + price_text.encode()
+    
+    if patch is not None:
+        _sample_file.seek(ts_offset)
+        _sample_file.write(patch)
+    else:
+        _rewrite_sample_file(timestamp, price)
+        _sample_fields = None
+    
+    log(f"   📝 Updated {SAMPLE_FILE} (price={price})")
+    return timestamp
+
+def _update_ticks(frame):
+    """Number of price ticks carried by an update frame"""
+    content = frame.get('content') or {}
+    return len(content.get('updates') or ()) or 1
+
+def test_websocket_streaming():
+    """Test WebSocket streaming and return the number of frames received"""
+    with buffered_output() as log:
+        log("\n🔍 Testing: WebSocket Streaming")
+        log(f"   WS /api/stream/{SAMPLE_FILE}")
+        
+        # Frames are small JSON on loopback, so skip UTF-8 validation and hand the
+        # raw bytes straight to orjson. websocket-client never negotiates
+        # permessage-deflate, so frames also arrive uncompressed (slightly more
+        # bytes on the wire, no per-frame inflate).
+        try:
+            ws = websocket.create_connection(
+                _STREAM_URL,
+                timeout=TIMEOUT,
+                skip_utf8_validation=True,
+            )
+        except (websocket.WebSocketException, OSError) as e:
+            log(f"   ❌ Connection failed: {e}")
+            return 0
+        
+        received = 0
+        updates_seen = 0
+        ticks_seen = 0
+        closed = False
+        written_timestamp = None
+        selector = selectors.DefaultSelector()
+        try:
+            ws.send("ping")
+            
+            # Single-threaded select() loop: block until a frame is readable, then
+            # drain whatever follows within WS_DRAIN_TIMEOUT and decode/print it as
+            # one batch instead of once per frame. websocket-client reads exactly
+            # one frame's bytes per recv, so nothing is left buffered behind select().
+            selector.register(ws.sock, selectors.EVENT_READ)
+            deadline = time.monotonic() + WS_TEST_DURATION
+            while not closed and updates_seen < WS_EXPECTED_UPDATES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(timeout=remaining):
+                    break
+            
+                messages = []
+                while True:
+                    opcode, frame_data = ws.recv_data()
+                    if opcode == websocket.ABNF.OPCODE_CLOSE:
+                        log("   ⚠️ Server closed the connection")
+                        closed = True
+                        break
+                    messages.append(frame_data)
+                    if time.monotonic() >= deadline or not selector.select(timeout=WS_DRAIN_TIMEOUT):
+                        break
             
-    except requests.exceptions.RequestException as e:
-        print(f"   ❌ Request failed: {e}")
-        return None
+                if not messages:
+                    continue
+            
+                parsed = [orjson.loads(message) for message in messages]
+                lines = [_HANDLERS.get(p.get('type'), _IGNORE_FRAME)(p) for p in parsed]
+                lines = [line for line in lines if line]
+                if lines:
+                    log("\n".join(lines))
+                received += len(parsed)
+                # Only count updates carrying our write; the server also sends an
+                # 'update' with the current content when the stream subscribes
+                updates = [
+                    p for p in parsed
+                    if p.get('type') == 'update'
+                    and written_timestamp is not None
+                    and (p.get('content') or {}).get('timestamp') == written_timestamp
+                ]
+                updates_seen += len(updates)
+                ticks_seen += sum(_update_ticks(p) for p in updates)
+                
+                # The server sends 'initial' only after its file watch is in
+                # place; writing any earlier could go unreported
+                if written_timestamp is None and any(p.get('type') == 'initial' for p in parsed):
+                    try:
+                        written_timestamp = update_sample_file(WS_UPDATE_BATCH, log)
+                    except OSError as e:
+                        log(f"   ❌ Failed to update {SAMPLE_FILE}: {e}")
+                        return received
+        except websocket.WebSocketException as e:
+            log(f"   ❌ WebSocket error: {e}")
+        finally:
+            selector.close()
+            ws.close()
+        
+        if written_timestamp is None:
+            log(f"   ❌ No initial frame received, {SAMPLE_FILE} was not updated")
+        elif updates_seen >= WS_EXPECTED_UPDATES:
+            log(f"   ✅ Received {received} messages ({ticks_seen} price ticks)")
+        else:
+            log(f"   ❌ Change to {SAMPLE_FILE} was not streamed ({received} messages received)")
+        return received
+
+def run_concurrently(*calls):
+    """Run independent (I/O-bound) test calls in parallel, returning results in order"""
+    with ThreadPoolExecutor(max_workers=max(len(calls), 1)) as executor:
+        return list(executor.map(lambda call: call(), calls))
 
 def main():
     """Run all API tests"""
+    global VERBOSE
+    parser = argparse.ArgumentParser(description="Trading Bot API Test Suite")
+    parser.add_argument("-v", "--verbose", action="store_true", help="pretty-print full response bodies")
+    VERBOSE = parser.parse_args().verbose
+    
     print("🧪 Trading Bot API Test Suite")
     print("=" * 50)
     
-    # Test 1: Health Check
-    test_endpoint("GET", "/health", description="Health Check")
-    
-    # Test 2: Start watching sample_data.json
-    watch_data = {"file_path": "./sample_data.json"}
-    test_endpoint("POST", "/api/watch", watch_data, "Start Watching File")
-    
-    # Test 3: List watched files
-    test_endpoint("GET", "/api/files", description="List Watched Files")
-    
-    # Test 4: Get file content
-    test_endpoint("GET", "/api/content/sample_data.json", description="Get File Content")
-    
     # Test 5: NEW! Process JSON with Ollama AI
     ollama_data = {
         "file_path": "./sample_data.json",
         "prompt": "Analyze this trading data and provide insights about market sentiment, price trends, and trading opportunities. Focus on the technical indicators and recent price action.",
         "model": "phi"  # Optional: specify a model, or let it use default
     }
-    test_endpoint("POST", "/api/ollama/process", ollama_data, "Ollama AI JSON Analysis")
     
     # Test 6: Test with different prompt
     analysis_data = {
         "file_path": "./sample_data.json",
         "prompt": "What are the key risk factors in this trading data? Provide a risk assessment score from 1-10.",
     }
-    test_endpoint("POST", "/api/ollama/process", analysis_data, "Ollama AI Risk Analysis")
+    
+    # Tests 1-4 go to the server as one batch (sub-requests run in order, so
+    # the watch is active before it is queried); the slow Ollama requests are
+    # sent alongside it so they don't hold up the batch response
+    run_concurrently(
+        lambda: test_batch([
+            ("POST", "/api/watch", {"file_path": "./sample_data.json"}, "Start Watching File"),
+            ("GET", "/health", None, "Health Check"),
+            ("GET", "/api/files", None, "List Watched Files"),
+            ("GET", "/api/content/sample_data.json", None, "Get File Content"),
+        ]),
+        lambda: test_endpoint("POST", "/api/ollama/process", ollama_data, "Ollama AI JSON Analysis", stream=True),
+        lambda: test_endpoint("POST", "/api/ollama/process", analysis_data, "Ollama AI Risk Analysis", stream=True),
+    )
+    
+    # Test 7: Stream file updates over WebSocket
+    test_websocket_streaming()
     
     print("\n🎉 API Test Suite Completed!")
     print("\n💡 Try these additional tests:")
@@ -95,7 +461,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-    main() 
+        main()
     except KeyboardInterrupt:
         print("\n\n⏹️ Test interrupted by user")
         sys.exit(0)